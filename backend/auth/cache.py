@@ -0,0 +1,104 @@
+# auth/cache.py
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Лёгкая запись пользователя для кэша (вместо ORM-объекта, привязанного к сессии)
+CachedUser = namedtuple("CachedUser", ["id", "email", "hashed_password"])
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Потокобезопасный LRU-кэш с ограниченным размером и временем жизни записей.
+    Отрицательные результаты (None) хранятся отдельно, со своими размером и
+    более коротким TTL, чтобы поток несуществующих ключей не вытеснял
+    положительные записи.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0,
+                 negative_maxsize: int = 256, negative_ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_maxsize = negative_maxsize
+        self.negative_ttl = negative_ttl
+        self._data = OrderedDict()
+        self._negative = OrderedDict()
+        self._lock = threading.Lock()
+        # Счётчик инвалидаций: запись, прочитанная из БД до инвалидации, не попадёт в кэш
+        self._generation = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        """Возвращает значение или _MISSING, если записи нет или она устарела."""
+        now = time.monotonic()
+        with self._lock:
+            for store in (self._data, self._negative):
+                item = store.get(key)
+                if item is None:
+                    continue
+                if item[1] <= now:
+                    del store[key]
+                    continue
+                store.move_to_end(key)
+                if item[0] is None:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+                return item[0]
+            self.misses += 1
+            return _MISSING
+
+    def set(self, key, value, generation: int = None):
+        """Сохраняет значение; если передан generation и с тех пор была инвалидация - пропускает."""
+        if value is not None:
+            store, other, ttl, maxsize = self._data, self._negative, self.ttl, self.maxsize
+        else:
+            store, other, ttl, maxsize = self._negative, self._data, self.negative_ttl, self.negative_maxsize
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            other.pop(key, None)
+            if maxsize <= 0 or ttl <= 0:
+                store.pop(key, None)
+                return
+            store[key] = (value, time.monotonic() + ttl)
+            store.move_to_end(key)
+            while len(store) > maxsize:
+                store.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._negative.pop(key, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._negative.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "negative_size": len(self._negative),
+                "negative_maxsize": self.negative_maxsize,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -1,11 +1,25 @@
 # auth/crud.py
+import os
 from sqlalchemy.orm import Session
 from auth.models import User
+from auth.cache import TTLCache, CachedUser, _MISSING
 from passlib.context import CryptContext
 
 # Настройка контекста для хеширования паролей
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Кэш пользователей по email (в т.ч. отрицательные результаты)
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "300")),
+    negative_maxsize=int(os.getenv("USER_CACHE_NEGATIVE_SIZE", "256")),
+    negative_ttl=float(os.getenv("USER_CACHE_NEGATIVE_TTL", "30")),
+)
+
+
+def _to_cached(user):
+    return CachedUser(id=user.id, email=user.email, hashed_password=user.hashed_password)
+
 
 def hash_password(password: str) -> str:
     """Безопасное хеширование пароля с помощью passlib + bcrypt"""
@@ -22,11 +36,18 @@ def verify_password(password: str, hashed: str) -> bool:
 
 
 def get_user_by_email(db: Session, email: str):
-    """Получение пользователя по email"""
+    """Получение пользователя по email (через кэш)"""
+    cached = user_cache.get(email)
+    if cached is not _MISSING:
+        return cached
+
     try:
+        generation = user_cache.generation()
         user = db.query(User).filter(User.email == email).first()
         print(f" Found user for {email}: {user}")
-        return user
+        record = _to_cached(user) if user else None
+        user_cache.set(email, record, generation=generation)
+        return record
     except Exception as e:
         print(f" Error getting user by email: {e}")
         return None
@@ -42,11 +63,34 @@ def create_user(db: Session, email: str, password: str):
         db.commit()
         db.refresh(user)
 
+        user_cache.invalidate(email)
         print(f" Created user: {user}")
         return user
     except Exception as e:
         print(f" Error creating user: {e}")
         db.rollback()
+        user_cache.invalidate(email)
+        return None
+
+
+def update_password(db: Session, email: str, new_password: str):
+    """Смена пароля пользователя"""
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if not user:
+            return None
+
+        user.hashed_password = hash_password(new_password)
+        db.commit()
+        db.refresh(user)
+
+        user_cache.invalidate(email)
+        print(f" Password updated for: {email}")
+        return user
+    except Exception as e:
+        print(f" Error updating password: {e}")
+        db.rollback()
+        user_cache.invalidate(email)
         return None
 
 
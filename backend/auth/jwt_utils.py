@@ -4,6 +4,8 @@ from jose import JWTError, jwt
 import os
 import secrets
 
+from auth.token_store import create_token_store
+
 # Секретные ключи (в продакшене должны быть разными, не забыть про это!)
 SECRET_KEY = os.getenv("SECRET_KEY", "simple-secret-key-for-amvera")
 REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY", "refresh-secret-key-for-amvera")
@@ -13,8 +15,8 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 15  # Сократил до 15 минут
 REFRESH_TOKEN_EXPIRE_DAYS = 30  # Refresh токен живет 30 дней
 
-# Хранилище refresh токенов в памяти (в продакшене лучше Redis/БД)
-active_refresh_tokens = set()
+# Хранилище активных refresh токенов (по умолчанию - общая БД, см. auth/token_store.py)
+token_store = create_token_store()
 
 
 def create_access_token(data: dict):
@@ -51,7 +53,7 @@ def create_refresh_token(data: dict):
         encoded_jwt = jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
 
         # Сохранение jti в активных токенах
-        active_refresh_tokens.add(jti)
+        token_store.add(jti, data.get("sub"), expire)
 
         print(f" Refresh token created for: {data.get('sub')}")
         return encoded_jwt
@@ -97,7 +99,7 @@ def decode_refresh_token(token: str):
 
         # Проверяем, что токен не отозван
         jti = payload.get("jti")
-        if jti not in active_refresh_tokens:
+        if not token_store.contains(jti):
             print(" Refresh token has been revoked")
             return None
 
@@ -119,7 +121,7 @@ def decode_refresh_token(token: str):
 def revoke_refresh_token(jti: str):
     """Отзыв refresh токена"""
     try:
-        active_refresh_tokens.discard(jti)
+        token_store.discard(jti)
         print(f" Refresh token revoked: {jti}")
         return True
     except Exception as e:
@@ -1,5 +1,5 @@
 # auth/models.py
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Integer, String
 from database import Base
 
 class User(Base):
@@ -10,4 +10,14 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
 
     def __repr__(self):
-        return f"<User(id={self.id}, email='{self.email}')>"
\ No newline at end of file
+        return f"<User(id={self.id}, email='{self.email}')>"
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String, primary_key=True)
+    email = Column(String, index=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+
+    def __repr__(self):
+        return f"<RefreshToken(email='{self.email}', expires_at={self.expires_at})>"
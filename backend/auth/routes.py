@@ -1,7 +1,7 @@
 # auth/routes.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_read_db
 from auth import crud, schemas
 from auth.jwt_utils import create_token_pair, decode_refresh_token, revoke_refresh_token
 
@@ -9,7 +9,7 @@ router = APIRouter()
 
 
 @router.post("/register")
-async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """Регистрация нового пользователя"""
     print(f" Registration attempt for: {user.email}")
 
@@ -22,6 +22,10 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
         # Создаем пользователя
         new_user = crud.create_user(db, user.email, user.password)
+        if not new_user and crud.get_user_by_email(db, user.email):
+            # Параллельная регистрация того же email успела раньше
+            print(f" User {user.email} already exists")
+            raise HTTPException(status_code=400, detail="Email already registered")
         if not new_user:
             print(f" Failed to create user {user.email}")
             raise HTTPException(status_code=500, detail="Failed to create user")
@@ -37,7 +41,7 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-async def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
+def login(user: schemas.UserLogin, db: Session = Depends(get_read_db)):
     """Вход в систему с созданием токенов"""
     print(f" Login attempt for: {user.email}")
 
@@ -127,4 +131,10 @@ async def test_db(db: Session = Depends(get_db)):
         users = db.query(crud.User).all()
         return {"status": "ok", "users_count": len(users)}
     except Exception as e:
-        return {"status": "error", "error": str(e)}
\ No newline at end of file
+        return {"status": "error", "error": str(e)}
+
+
+@router.get("/cache/stats")
+async def user_cache_stats():
+    """Статистика кэша пользователей (попадания/промахи)"""
+    return crud.user_cache.stats()
@@ -0,0 +1,100 @@
+# auth/token_store.py
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+# Где хранить активные refresh токены: "sql" - общая БД (нужно для нескольких воркеров),
+# "memory" - в памяти процесса (только для одного воркера)
+TOKEN_STORE_BACKEND = os.getenv("TOKEN_STORE", "sql")
+
+
+class TokenStore(ABC):
+    """Интерфейс хранилища активных refresh токенов (по jti)."""
+
+    @abstractmethod
+    def add(self, jti: str, email: str, expires_at: datetime):
+        ...
+
+    @abstractmethod
+    def contains(self, jti: str) -> bool:
+        ...
+
+    @abstractmethod
+    def discard(self, jti: str) -> bool:
+        """Удаляет токен; возвращает True, если он был активен."""
+
+
+class MemoryTokenStore(TokenStore):
+    """Токены в памяти процесса - как раньше, подходит только для одного воркера."""
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, email: str, expires_at: datetime):
+        with self._lock:
+            self._tokens[jti] = expires_at
+
+    def contains(self, jti: str) -> bool:
+        with self._lock:
+            expires_at = self._tokens.get(jti)
+            return expires_at is not None and expires_at > datetime.utcnow()
+
+    def discard(self, jti: str) -> bool:
+        with self._lock:
+            return self._tokens.pop(jti, None) is not None
+
+
+class SQLTokenStore(TokenStore):
+    """Токены в общей БД (таблица refresh_tokens) - видны всем воркерам и машинам."""
+
+    def add(self, jti: str, email: str, expires_at: datetime):
+        from database import SessionLocal
+        from auth.models import RefreshToken
+
+        db = SessionLocal()
+        try:
+            # Заодно чистим истёкшие токены
+            db.query(RefreshToken).filter(RefreshToken.expires_at <= datetime.utcnow()).delete()
+            db.add(RefreshToken(jti=jti, email=email, expires_at=expires_at))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def contains(self, jti: str) -> bool:
+        from database import ReadSessionLocal
+        from auth.models import RefreshToken
+
+        db = ReadSessionLocal()
+        try:
+            token = db.query(RefreshToken).filter(RefreshToken.jti == jti).first()
+            return token is not None and token.expires_at > datetime.utcnow()
+        finally:
+            db.close()
+
+    def discard(self, jti: str) -> bool:
+        from database import SessionLocal
+        from auth.models import RefreshToken
+
+        db = SessionLocal()
+        try:
+            deleted = db.query(RefreshToken).filter(RefreshToken.jti == jti).delete()
+            db.commit()
+            return deleted > 0
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def create_token_store(backend: str = TOKEN_STORE_BACKEND) -> TokenStore:
+    if backend == "memory":
+        return MemoryTokenStore()
+    if backend == "sql":
+        return SQLTokenStore()
+    raise ValueError(f"Неизвестное хранилище токенов: {backend}")
@@ -1,21 +1,69 @@
 # database.py
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# путь к БД в рабочей директории
-DB_PATH = "/data/users.db"
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
+# URL БД берём из окружения, по умолчанию - SQLite в /data
+DB_PATH = os.getenv("DB_PATH", "/data/users.db")
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+# Настройки пула и SQLite
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+IS_MEMORY_DB = IS_SQLITE and (SQLALCHEMY_DATABASE_URL in ("sqlite://", "sqlite:///") or ":memory:" in SQLALCHEMY_DATABASE_URL)
 
 print(f"🗄️ Database URL: {SQLALCHEMY_DATABASE_URL}")
 
-# Создаем движок с минимальными настройками
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+
+def _create_engine(read_only: bool = False):
+    """Создание движка с настройками пула и PRAGMA для SQLite"""
+    connect_args = {}
+    if IS_SQLITE:
+        # timeout - ожидание блокировки на уровне драйвера sqlite3 (в секундах)
+        connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+
+    pool_args = {}
+    if not IS_MEMORY_DB:
+        # In-memory SQLite использует SingletonThreadPool, размеры пула к нему неприменимы
+        pool_args = {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        }
+
+    new_engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args=connect_args,
+        pool_pre_ping=True,
+        **pool_args,
+    )
+
+    if IS_SQLITE:
+        @event.listens_for(new_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # WAL: читатели не блокируют писателя и наоборот
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+            cursor.close()
+
+    return new_engine
+
+
+engine = _create_engine()
+# Отдельный движок только для чтения: запросы из него никогда не берут блокировку записи
+read_engine = _create_engine(read_only=True) if IS_SQLITE and not IS_MEMORY_DB else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 def get_db():
@@ -27,6 +75,15 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Получение сессии БД только для чтения (логин, поиск пользователя)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def create_tables():
     """Создание всех таблиц"""
     try:
@@ -35,4 +92,4 @@ def create_tables():
         return True
     except Exception as e:
         print(f"Error creating tables: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -1,39 +1,135 @@
 # base.py
+import importlib
+
+# Реестр фильтров: имя -> (модуль, функция). Модули импортируются при первом вызове.
+# Чтобы добавить фильтр, достаточно добавить запись сюда.
+FILTERS = {
+    "canny": ("filters.canny", "apply_canny"),
+    "kmeans": ("filters.kmeans", "apply_kmeans"),
+    "stylize": ("filters.stylize", "apply_stylize"),
+}
+
+# Векторизованные реализации для пачки кадров (N, H, W, 3)
+BATCH_FILTERS = {
+    "kmeans": ("filters.kmeans", "apply_kmeans_batch"),
+}
+
+# Имена всех фильтров, известных диспетчеру apply_filter
+FILTER_NAMES = ["none", *FILTERS]
+
+
+def _load(spec):
+    module_name, func_name = spec
+    return getattr(importlib.import_module(module_name), func_name)
+
+
 def apply_filter(img, filter_type: str):
     """
     Диспетчер фильтров.
     """
     if filter_type == "none":
         return img  # без изменений
-    elif filter_type == "canny":
-        from filters.canny import apply_canny
-        return apply_canny(img)
-    elif filter_type == "kmeans":
-        from filters.kmeans import apply_kmeans
-        return apply_kmeans(img)
-    elif filter_type == "stylize":
-        from filters.stylize import apply_stylize
-        return apply_stylize(img)
-    elif filter_type == "voronoi":
-        from filters.voronoi import apply_voronoi
-        return apply_voronoi(img)
-    elif filter_type == "voronoi_colored":
-        from filters.voronoi_colored import apply_voronoi_colored
-        return apply_voronoi_colored(img)
-    elif filter_type == "adaptive_enhancement":
-        from filters.adaptive_enhancement import apply_adaptive_enhancement
-        return apply_adaptive_enhancement(img)
-    elif filter_type == "neural_flow":  # НОВЫЙ ФИЛЬТР
-        from filters.neural_flow import apply_neural_flow
-        return apply_neural_flow(img)
-    elif filter_type == "quantum_ripple":  # НОВЫЙ ФИЛЬТР
-        from filters.quantum_ripple import apply_quantum_ripple
-        return apply_quantum_ripple(img)
-    elif filter_type == "crystal_fractal":  # НОВЫЙ ФИЛЬТР
-        from filters.crystal_fractal import apply_crystal_fractal
-        return apply_crystal_fractal(img)
-    elif filter_type == "neon_dreams":
-        from filters.neon_dreams import apply_neon_dreams
-        return apply_neon_dreams(img)
-    else:
-        raise ValueError(f"Неизвестный фильтр: {filter_type}")
\ No newline at end of file
+    spec = FILTERS.get(filter_type)
+    if spec is None:
+        raise ValueError(f"Неизвестный фильтр: {filter_type}")
+    return _load(spec)(img)
+
+
+def _get_batch_filter(filter_type: str):
+    """
+    Возвращает векторизованную реализацию фильтра для пачки кадров
+    (N, H, W, 3) или None, если фильтр умеет работать только покадрово.
+    """
+    spec = BATCH_FILTERS.get(filter_type)
+    return _load(spec) if spec else None
+
+
+def _apply_each(frames, filter_type: str):
+    """
+    Покадровая обработка: ошибка на одном кадре не прерывает остальные,
+    вместо результата такого кадра возвращается None.
+    """
+    results = []
+    for i, frame in enumerate(frames):
+        try:
+            if frame is None:
+                raise ValueError("Пустой кадр")
+            results.append(apply_filter(frame, filter_type))
+        except Exception as e:
+            print(f"Error filtering frame {i}: {e}")
+            results.append(None)
+    return results
+
+
+def apply_filter_batch(frames, filter_type: str):
+    """
+    Пакетный диспетчер фильтров.
+    Кадры одинакового размера складываются в один массив и обрабатываются
+    разом; для фильтров без пакетной реализации - покадровый fallback.
+    Принимает список кадров или массив (N, H, W, C).
+    Порядок результатов совпадает с порядком входных кадров; для кадров,
+    которые не удалось обработать (в т.ч. None на входе), результат - None.
+    """
+    if filter_type not in FILTER_NAMES:
+        raise ValueError(f"Неизвестный фильтр: {filter_type}")
+
+    if filter_type == "none":
+        return list(frames)
+
+    batch_fn = _get_batch_filter(filter_type)
+    if batch_fn is None:
+        return _apply_each(frames, filter_type)
+
+    import numpy as np
+
+    # Готовый массив (N, H, W, C), например memmap из FrameStore, - без копирования
+    if isinstance(frames, np.ndarray) and frames.ndim == 4:
+        try:
+            return list(batch_fn(frames))
+        except Exception as e:
+            print(f"Batch filter failed, falling back to per-frame: {e}")
+            return _apply_each(frames, filter_type)
+
+    # Группируем индексы кадров по форме и типу
+    groups = {}
+    for i, frame in enumerate(frames):
+        if frame is not None:
+            groups.setdefault((frame.shape, frame.dtype.str), []).append(i)
+
+    results = [None] * len(frames)
+    for indices in groups.values():
+        group_frames = [frames[i] for i in indices]
+        if len(indices) == 1:
+            filtered = _apply_each(group_frames, filter_type)
+        else:
+            try:
+                filtered = batch_fn(np.stack(group_frames))
+            except Exception as e:
+                print(f"Batch filter failed, falling back to per-frame: {e}")
+                filtered = _apply_each(group_frames, filter_type)
+        for i, out in zip(indices, filtered):
+            results[i] = out
+    return results
+
+
+def warm_up_filters(size: int = 16) -> dict:
+    """
+    Прогрев фильтров: импортирует модуль каждого фильтра и прогоняет его
+    на маленьком изображении, чтобы первый запрос не платил за импорт.
+    Возвращает время прогрева (мс) по каждому фильтру; фильтры,
+    упавшие при прогреве, пропускаются.
+    """
+    import time
+    import numpy as np
+
+    img = np.random.randint(0, 256, (size, size, 3), dtype=np.uint8)
+    timings = {}
+    for name in FILTER_NAMES:
+        start = time.perf_counter()
+        try:
+            apply_filter(img, name)
+        except Exception as e:
+            print(f"Warm-up skipped for {name}: {e}")
+            continue
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+    return timings
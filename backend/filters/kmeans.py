@@ -10,4 +10,30 @@ def apply_kmeans(img, k: int = 4):
     # Восстановление изображения
     centers = np.uint8(centers)
     segmented = centers[labels.flatten()]
-    return segmented.reshape((img.shape))
\ No newline at end of file
+    return segmented.reshape((img.shape))
+
+def apply_kmeans_batch(frames: np.ndarray, k: int = 4, sample_size: int = 100_000):
+    """
+    Кластеризация пачки кадров одинакового размера (N, H, W, 3)
+    с одним общим набором центроидов на всю пачку.
+    """
+    pixels = frames.reshape((-1, 3))
+    # Центроиды обучаем на случайной выборке пикселей со всех кадров
+    if pixels.shape[0] > sample_size:
+        # Generator.choice без замены не переставляет все N индексов, в отличие от np.random.choice
+        idx = np.random.default_rng().choice(pixels.shape[0], sample_size, replace=False)
+        sample = pixels[idx]
+    else:
+        sample = pixels
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
+    _, _, centers = cv2.kmeans(sample.astype(np.float32), k, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
+
+    # Назначение кластеров: argmin(|c|^2 - 2 z·c), покадрово, чтобы не раздувать память
+    centers_sq = (centers ** 2).sum(axis=1)
+    palette = np.uint8(centers)
+    result = np.empty_like(frames)
+    for i, frame in enumerate(frames):
+        Z = frame.reshape((-1, 3)).astype(np.float32)
+        labels = np.argmin(centers_sq - 2.0 * (Z @ centers.T), axis=1)
+        result[i] = palette[labels].reshape(frame.shape)
+    return result
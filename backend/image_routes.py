@@ -0,0 +1,294 @@
+# image_routes.py
+# Эндпоинты обработки изображений и видео. Модуль тянет OpenCV,
+# поэтому main.py подключает его только в режимах, где он нужен.
+from fastapi import APIRouter, UploadFile, File, Form, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+
+import os
+import time
+import cv2
+import tempfile
+from pathlib import Path
+import io
+import shutil
+import zipfile
+
+from auth.dependencies import get_current_user
+from filters.base import FILTER_NAMES, apply_filter, apply_filter_batch
+from utils.image_io import upload_to_array, array_to_base64_bytes, json_body_parts
+from utils.video_io import extract_significant_frames
+from utils.admission import admission, AdmissionRejected
+from utils.dedup import group_duplicates, DEDUP_MAX_DISTANCE
+
+router = APIRouter()
+
+# Сколько кадров фильтруется и кодируется за раз: в памяти не бывает больше одной пачки
+FILTER_CHUNK_FRAMES = int(os.getenv("FILTER_CHUNK_FRAMES", "16"))
+
+
+def _pixels(images) -> int:
+    """Суммарное число пикселей - входной параметр модели стоимости"""
+    return sum(img.shape[0] * img.shape[1] for img in images)
+
+
+def _decode_upload(file: UploadFile):
+    """Декодирует загрузку; cv2.imdecode не бросает исключение, а возвращает None"""
+    img = upload_to_array(file.file)
+    if img is None:
+        raise ValueError(f"Не удалось декодировать изображение: {file.filename}")
+    return img
+
+
+def _encode_png(img):
+    success, buf = cv2.imencode('.png', img)
+    return buf.tobytes() if success else None
+
+
+def _filter_and_encode(images, filter_type: str, encode):
+    """
+    Фильтрует и сразу кодирует пачками по FILTER_CHUNK_FRAMES.
+    Срезы FrameStore после сброса на диск - view в memmap, поэтому
+    ни входные, ни отфильтрованные кадры целиком в RAM не попадают.
+    """
+    out = []
+    for start in range(0, len(images), FILTER_CHUNK_FRAMES):
+        filtered = apply_filter_batch(images[start:start + FILTER_CHUNK_FRAMES], filter_type)
+        out.extend(None if result is None else encode(result) for result in filtered)
+    return out
+
+
+def _filter_and_encode_one(img, filter_type: str) -> bytes:
+    """Фильтр и кодирование в одной полосе - как в пакетном пути (_filter_and_encode)"""
+    return array_to_base64_bytes(apply_filter(img, filter_type))
+
+
+async def _process(images, filter_type: str, encode, dedup: bool, max_distance: int):
+    """
+    Общий путь пакетной обработки: (опционально) группировка дубликатов,
+    допуск по пикселям только тех изображений, что реально фильтруются,
+    фильтрация с кодированием пачками и раздача результатов группам.
+    Возвращает (закодированные результаты в исходном порядке, статистику дедупликации).
+    """
+    if not dedup:
+        encoded = await admission.run(
+            filter_type, _pixels(images), _filter_and_encode, images, filter_type, encode
+        )
+        return encoded, None
+
+    representatives, assignment = await run_in_threadpool(group_duplicates, images, max_distance)
+    # Список view (для FrameStore - в memmap), без копирования кадров
+    unique = [images[i] for i in representatives]
+    encoded = await admission.run(
+        filter_type, _pixels(unique), _filter_and_encode, unique, filter_type, encode
+    )
+    stats = {
+        "total": len(assignment),
+        "unique": len(representatives),
+        "saved": len(assignment) - len(representatives),
+    }
+    return [encoded[group] for group in assignment], stats
+
+
+def _json_stream_response(images_key: str, images, **extra):
+    """
+    JSON-ответ с изображениями: части тела уходят в поток ответа по очереди,
+    base64 каждого изображения не копируется в общее тело.
+    Размер известен заранее, поэтому ответ идёт с Content-Length, а не chunked.
+    """
+    parts = json_body_parts(images_key, images, **extra)
+
+    async def stream():
+        for part in parts:
+            yield part
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/json",
+        headers={"Content-Length": str(sum(len(part) for part in parts))}
+    )
+
+
+def _unknown_filter_response(filter_type: str):
+    """Ответ 400 для неизвестного фильтра - до допуска и обработки"""
+    return JSONResponse(
+        status_code=400,
+        content={"error": f"Неизвестный фильтр: {filter_type}", "filters": FILTER_NAMES}
+    )
+
+
+def _overloaded_response(e: AdmissionRejected):
+    """Ответ 503 при отказе в допуске"""
+    print(f"Request rejected by admission control: {e}")
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(e), "estimated_ms": round(e.estimated_ms)},
+        headers={"Retry-After": str(e.retry_after_s)}
+    )
+
+
+# API эндпоинты для обработки изображений
+@router.post("/process/")
+async def process_image(
+        file: UploadFile = File(...),
+        filter_type: str = Form(...),
+        user: str = Depends(get_current_user)
+):
+    """Обработка одного изображения"""
+    if filter_type not in FILTER_NAMES:
+        return _unknown_filter_response(filter_type)
+
+    try:
+        start_time = time.time()
+
+        img = await run_in_threadpool(_decode_upload, file)
+        encoded = await admission.run(filter_type, _pixels([img]), _filter_and_encode_one, img, filter_type)
+
+        duration = round((time.time() - start_time) * 1000)
+        return _json_stream_response("image", encoded, duration_ms=duration)
+
+    except AdmissionRejected as e:
+        return _overloaded_response(e)
+    except Exception as e:
+        print(f"Image processing error: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+
+@router.post("/process/batch/inline/")
+async def process_batch_inline(
+        files: list[UploadFile] = File(...),
+        filter_type: str = Form(...),
+        dedup: bool = Form(False),
+        dedup_distance: int = Form(DEDUP_MAX_DISTANCE),
+        user: str = Depends(get_current_user)
+):
+    """Обработка нескольких изображений (inline)"""
+    if filter_type not in FILTER_NAMES:
+        return _unknown_filter_response(filter_type)
+
+    results = [None] * len(files)
+
+    # Сначала декодируем все файлы, чтобы обработать кадры одного размера пачкой
+    indices, images = [], []
+    for i, file in enumerate(files):
+        try:
+            images.append(await run_in_threadpool(_decode_upload, file))
+            indices.append(i)
+        except Exception as e:
+            print(f"Error decoding file {i}: {e}")
+
+    dedup_stats = None
+    try:
+        encoded, dedup_stats = await _process(images, filter_type, array_to_base64_bytes, dedup, dedup_distance)
+        for i, result in zip(indices, encoded):
+            results[i] = result
+    except AdmissionRejected as e:
+        return _overloaded_response(e)
+    except Exception as e:
+        print(f"Error processing batch: {e}")
+
+    extra = {"dedup": dedup_stats} if dedup_stats else {}
+    return _json_stream_response("images", results, **extra)
+
+
+@router.post("/process/batch/")
+async def process_batch_zip(
+        files: list[UploadFile] = File(...),
+        filter_type: str = Form(...),
+        dedup: bool = Form(False),
+        dedup_distance: int = Form(DEDUP_MAX_DISTANCE),
+        user: str = Depends(get_current_user)
+):
+    """Обработка нескольких изображений (zip)"""
+    if filter_type not in FILTER_NAMES:
+        return _unknown_filter_response(filter_type)
+
+    zip_io = io.BytesIO()
+    dedup_stats = None
+
+    with zipfile.ZipFile(zip_io, mode="w", compression=zipfile.ZIP_DEFLATED) as zipf:
+        indices, images = [], []
+        for i, file in enumerate(files):
+            try:
+                images.append(await run_in_threadpool(_decode_upload, file))
+                indices.append(i)
+            except Exception as e:
+                zipf.writestr(f"error_{i + 1}.txt", f"Ошибка: {str(e)}")
+
+        try:
+            encoded, dedup_stats = await _process(images, filter_type, _encode_png, dedup, dedup_distance)
+        except AdmissionRejected as e:
+            return _overloaded_response(e)
+        except Exception as e:
+            encoded = None
+            for i in indices:
+                zipf.writestr(f"error_{i + 1}.txt", f"Ошибка: {str(e)}")
+
+        if encoded is not None:
+            for i, png in zip(indices, encoded):
+                if png is None:
+                    zipf.writestr(f"error_{i + 1}.txt", "Ошибка: не удалось применить фильтр")
+                else:
+                    zipf.writestr(f"filtered_{i + 1}.png", png)
+
+    headers = {"Content-Disposition": "attachment; filename=filtered_images.zip"}
+    if dedup_stats:
+        headers["X-Dedup-Total"] = str(dedup_stats["total"])
+        headers["X-Dedup-Unique"] = str(dedup_stats["unique"])
+        headers["X-Dedup-Saved"] = str(dedup_stats["saved"])
+
+    zip_io.seek(0)
+    return StreamingResponse(
+        zip_io,
+        media_type="application/x-zip-compressed",
+        headers=headers
+    )
+
+
+# Обработка видео
+@router.post("/process/video/")
+async def process_video(
+        file: UploadFile = File(...),
+        filter_type: str = Form(...),
+        dedup: bool = Form(False),
+        dedup_distance: int = Form(DEDUP_MAX_DISTANCE),
+        user: str = Depends(get_current_user)
+):
+    """Обработка видео (извлечение кадров)"""
+    if filter_type not in FILTER_NAMES:
+        return _unknown_filter_response(filter_type)
+
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
+            # Копируем поток загрузки в файл кусками, без чтения целиком в память
+            await run_in_threadpool(shutil.copyfileobj, file.file, tmp)
+            tmp_path = Path(tmp.name)
+
+        try:
+            raw_frames = await run_in_threadpool(extract_significant_frames, str(tmp_path), 30.0)
+        finally:
+            tmp_path.unlink()
+
+        # Кадры могут лежать в memmap - кодируем до закрытия хранилища
+        with raw_frames:
+            results, dedup_stats = await _process(
+                raw_frames, filter_type, array_to_base64_bytes, dedup, dedup_distance
+            )
+
+        extra = {"dedup": dedup_stats} if dedup_stats else {}
+        return _json_stream_response("frames", results, **extra)
+
+    except AdmissionRejected as e:
+        return _overloaded_response(e)
+    except Exception as e:
+        print(f"Video processing error: {e}")
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+
+@router.get("/process/stats")
+async def processing_stats():
+    """Состояние контроля допуска: очереди полос и модели стоимости фильтров"""
+    return admission.stats()
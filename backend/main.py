@@ -1,42 +1,56 @@
 # main.py
-from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, Request
+import time
+
+# Точка отсчёта холодного старта - до импорта тяжёлых зависимостей
+_IMPORT_START = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, StreamingResponse
-from fastapi.security import OAuth2PasswordBearer
-from fastapi import status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 import os
-import time
+import socket
 import traceback
-import cv2
-import tempfile
-from pathlib import Path
-import io
-import zipfile
 
-from auth.jwt_utils import decode_access_token
+# Роль процесса: "all" - всё приложение, "auth" - только авторизация (без OpenCV)
+APP_ROLE = os.getenv("APP_ROLE", "all")
+IMAGE_ROUTES_ENABLED = APP_ROLE != "auth"
+# Прогрев фильтров при старте (импорт и прогон на маленьком изображении)
+WARMUP_FILTERS = os.getenv("WARMUP_FILTERS", "1") == "1"
 
+from utils.workers import create_worker_registry, worker_load, HEARTBEAT_INTERVAL_S
 
-# Инициализация приложения
-app = FastAPI(title="Image Filter App with Auth")
+# PID уникален только в пределах машины/контейнера, поэтому добавляем имя хоста
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+worker_registry = create_worker_registry()
+_STARTED_AT = time.time()
 
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
+def _worker_status() -> dict:
+    status = worker_load()
+    status.update(role=APP_ROLE, uptime_s=round(time.time() - _STARTED_AT))
+    return status
 
-# Инициализация БД при старте
-@app.on_event("startup")
-async def startup_event():
-    """Инициализация при запуске"""
-    print("Starting application...")
+
+async def _heartbeat_loop():
+    """Периодически обновляет запись воркера в реестре"""
+    while True:
+        try:
+            worker_registry.heartbeat(WORKER_ID, _worker_status())
+        except Exception as e:
+            print(f"Heartbeat error: {e}")
+        await asyncio.sleep(HEARTBEAT_INTERVAL_S)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Инициализация при запуске: БД, прогрев фильтров, замер холодного старта"""
+    print(f"Starting application (role: {APP_ROLE})...")
+    startup_start = time.perf_counter()
 
     try:
         from database import create_tables
@@ -51,32 +65,83 @@ async def startup_event():
     except Exception as e:
         print(f"Startup error: {e}")
 
+    warmup = {}
+    if IMAGE_ROUTES_ENABLED and WARMUP_FILTERS:
+        from filters.base import warm_up_filters
+        warmup = warm_up_filters()
 
-# Импорты для auth
-from database import get_db
-from auth import crud, schemas
-from auth.jwt_utils import create_access_token, decode_access_token
+    now = time.perf_counter()
+    app.state.startup = {
+        "role": APP_ROLE,
+        "import_ms": round((startup_start - _IMPORT_START) * 1000),
+        "startup_ms": round((now - startup_start) * 1000),
+        "cold_start_ms": round((now - _IMPORT_START) * 1000),
+        "warmup_ms": warmup,
+    }
+    print(f"Cold start: {app.state.startup}")
+
+    # Публикуем нагрузку воркера в общий реестр
+    app.state.ready = True
+    heartbeat_task = asyncio.create_task(_heartbeat_loop())
 
-# OAuth2 для защищенных эндпоинтов
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+    yield
+
+    heartbeat_task.cancel()
+    worker_registry.remove(WORKER_ID)
+
+
+# Инициализация приложения
+app = FastAPI(title="Image Filter App with Auth", lifespan=lifespan)
+
+# CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Получение текущего пользователя из токена"""
-    email = decode_access_token(token)
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return email
+# Импорты для auth
+from database import get_db, get_read_db
+from auth import crud, schemas
+from auth.dependencies import get_current_user
+
+
+# Состояние воркеров
+@app.get("/health")
+async def health():
+    """Нагрузка и глубина очередей всех живых воркеров"""
+    worker_registry.heartbeat(WORKER_ID, _worker_status())
+    workers = worker_registry.list()
+    return {
+        "status": "ok",
+        "worker_id": WORKER_ID,
+        "workers": workers,
+        "total_queue_depth": sum(w.get("queue_depth", 0) for w in workers),
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """Готовность текущего воркера: старт завершён и БД доступна"""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"ready": False, "reason": "starting"})
+    try:
+        from sqlalchemy import text
+        from database import engine
 
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"ready": False, "reason": str(e)})
+    return {"ready": True, "worker_id": WORKER_ID, "startup": app.state.startup}
 
 
 # ПРЯМЫЕ AUTH ЭНДПОИНТЫ
 @app.post("/register")
-async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """Регистрация нового пользователя"""
     print(f"Registration attempt for: {user.email}")
 
@@ -89,6 +154,10 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
         # Создаем пользователя
         new_user = crud.create_user(db, user.email, user.password)
+        if not new_user and crud.get_user_by_email(db, user.email):
+            # Параллельная регистрация того же email успела раньше
+            print(f"User {user.email} already exists")
+            raise HTTPException(status_code=400, detail="Email already registered")
         if not new_user:
             print(f"Failed to create user {user.email}")
             raise HTTPException(status_code=500, detail="Failed to create user")
@@ -105,7 +174,7 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @app.post("/login")
-async def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
+def login(user: schemas.UserLogin, db: Session = Depends(get_read_db)):
     """Вход в систему с созданием токенов"""
     print(f"Login attempt for: {user.email}")
 
@@ -195,141 +264,27 @@ app.include_router(auth_router, prefix="/auth", tags=["auth"])
 
 
 
-# Импорты для обработки изображений
-from filters.base import apply_filter
-from utils.image_io import image_bytes_to_array, array_to_base64
-from utils.video_io import extract_significant_frames
-
-
-# API эндпоинты для обработки изображений
-@app.post("/process/")
-async def process_image(
-        file: UploadFile = File(...),
-        filter_type: str = Form(...),
-        user: str = Depends(get_current_user)
-):
-    """Обработка одного изображения"""
-    try:
-        start_time = time.time()
+# Эндпоинты обработки изображений (OpenCV) - не нужны воркерам только с auth
+if IMAGE_ROUTES_ENABLED:
+    from image_routes import router as image_router
 
-        content = await file.read()
-        img = image_bytes_to_array(content)
-        result = apply_filter(img, filter_type)
-        encoded = array_to_base64(result)
+    app.include_router(image_router, tags=["images"])
 
-        duration = round((time.time() - start_time) * 1000)
-        return {"image": encoded, "duration_ms": duration}
 
-    except Exception as e:
-        print(f"Image processing error: {e}")
-        return JSONResponse(
-            status_code=500,
-            content={"error": str(e)}
-        )
-
-
-@app.post("/process/batch/inline/")
-async def process_batch_inline(
-        files: list[UploadFile] = File(...),
-        filter_type: str = Form(...),
-        user: str = Depends(get_current_user)
-):
-    """Обработка нескольких изображений (inline)"""
-    results = []
-    for i, file in enumerate(files):
-        try:
-            content = await file.read()
-            img = image_bytes_to_array(content)
-            result = apply_filter(img, filter_type)
-            encoded = array_to_base64(result)
-            results.append(encoded)
-        except Exception as e:
-            print(f"Error processing file {i}: {e}")
-            results.append(None)
-    return {"images": results}
-
-
-@app.post("/process/batch/")
-async def process_batch_zip(
-        files: list[UploadFile] = File(...),
-        filter_type: str = Form(...),
-        user: str = Depends(get_current_user)
-):
-    """Обработка нескольких изображений (zip)"""
-    zip_io = io.BytesIO()
-
-    with zipfile.ZipFile(zip_io, mode="w", compression=zipfile.ZIP_DEFLATED) as zipf:
-        for i, file in enumerate(files):
-            try:
-                content = await file.read()
-                img = image_bytes_to_array(content)
-                result = apply_filter(img, filter_type)
-                success, encoded_img = cv2.imencode('.png', result)
-                if success:
-                    zipf.writestr(f"filtered_{i + 1}.png", encoded_img.tobytes())
-            except Exception as e:
-                zipf.writestr(f"error_{i + 1}.txt", f"Ошибка: {str(e)}")
-
-    zip_io.seek(0)
-    return StreamingResponse(
-        zip_io,
-        media_type="application/x-zip-compressed",
-        headers={"Content-Disposition": "attachment; filename=filtered_images.zip"}
-    )
-
-
-# Обработка видео
-@app.post("/process/video/")
-async def process_video(
-        file: UploadFile = File(...),
-        filter_type: str = Form(...),
-        user: str = Depends(get_current_user)
-):
-    """Обработка видео (извлечение кадров)"""
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
-            tmp.write(await file.read())
-            tmp_path = Path(tmp.name)
-
-        raw_frames = extract_significant_frames(str(tmp_path), threshold=30.0)
-        tmp_path.unlink()
-
-        results = []
-        for frame in raw_frames:
-            filtered = apply_filter(frame, filter_type)
-            encoded = array_to_base64(filtered)
-            results.append(encoded)
-
-        return {"frames": results}
-
-    except Exception as e:
-        print(f"Video processing error: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
-
-
-# Статические файлы (фронтенд)
-class SPAStaticFiles(StaticFiles):
-    """Кастомный класс для SPA маршрутизации"""
-
-    async def get_response(self, path: str, scope):
-        try:
-            return await super().get_response(path, scope)
-        except HTTPException as ex:
-            if ex.status_code == 404:
-                return await super().get_response("index.html", scope)
-            else:
-                raise ex
+# Статические файлы (фронтенд): предсжатые ассеты, кэш-заголовки, index.html из памяти
+from utils.static_files import STATIC_DIR, PrecompressedStaticFiles, SPAStaticFiles
 
 
 # Монтирование статических файлов
-static_dir = os.getenv("STATIC_DIR", "/app/frontend/dist")
+static_dir = STATIC_DIR
 if os.path.exists(static_dir):
     print(f"Static directory found: {static_dir}")
 
     # Assets
     assets_dir = f"{static_dir}/assets"
     if os.path.exists(assets_dir):
-        app.mount("/assets", StaticFiles(directory=assets_dir), name="assets")
+        # Имена файлов в /assets содержат хеш сборки - их можно кэшировать навсегда
+        app.mount("/assets", PrecompressedStaticFiles(directory=assets_dir, immutable=True), name="assets")
         print(f"Assets mounted: {assets_dir}")
 
     # SPA файлы
@@ -0,0 +1,70 @@
+# run.py
+"""
+Запуск приложения в многопроцессном режиме.
+
+    python run.py                      # воркеры по числу ядер
+    WEB_CONCURRENCY=4 python run.py    # явное число API-воркеров
+
+Число API-воркеров (процессов uvicorn) берётся из WEB_CONCURRENCY или равно
+числу ядер; потоки вычислений (полосы контроля допуска) делят ядра между
+воркерами, чтобы суммарно не превышать их число.
+
+Общее состояние между воркерами:
+  - refresh токены - в БД (TOKEN_STORE=sql, таблица refresh_tokens);
+  - реестр воркеров и их нагрузка - файлы в STATE_DIR;
+  - кэш пользователей остаётся локальным, поэтому TTL по умолчанию
+    сокращается, а отрицательное кэширование отключается.
+Для нескольких машин DATABASE_URL и STATE_DIR должны указывать на общие ресурсы.
+
+Статика фронтенда (STATIC_DIR) сжимается в .gz/.br один раз здесь, до запуска
+воркеров (STATIC_PRECOMPRESS=0 для них).
+
+Состояние воркеров: GET /health (нагрузка и очереди всех воркеров),
+GET /ready (готовность текущего воркера).
+"""
+import os
+
+
+def configure_workers(cores: int = None) -> int:
+    """Выставляет переменные окружения для воркеров; возвращает число API-воркеров."""
+    cores = cores or os.cpu_count() or 1
+    api_workers = max(1, int(os.getenv("WEB_CONCURRENCY", str(cores))))
+    compute_threads = max(1, cores // api_workers)
+
+    os.environ.setdefault("SLOW_LANE_WORKERS", str(compute_threads))
+    os.environ.setdefault("FAST_LANE_WORKERS", "1")
+    if api_workers > 1:
+        # Состояние должно быть общим для всех процессов
+        os.environ.setdefault("TOKEN_STORE", "sql")
+        # Локальный кэш пользователей: короткий TTL, без отрицательных записей
+        os.environ.setdefault("USER_CACHE_TTL", "30")
+        os.environ.setdefault("USER_CACHE_NEGATIVE_TTL", "0")
+    return api_workers
+
+
+def precompress_static():
+    """
+    Предсжатие статики один раз до запуска воркеров: иначе каждый процесс
+    сжимал бы те же файлы при импорте приложения.
+    """
+    # Выключаем до импорта: воркеры и приложение в этом процессе читают флаг при импорте
+    os.environ["STATIC_PRECOMPRESS"] = "0"
+    from utils.static_files import STATIC_DIR, precompress_directory
+
+    if os.path.isdir(STATIC_DIR):
+        precompress_directory(STATIC_DIR)
+
+
+def main():
+    import uvicorn
+
+    workers = configure_workers()
+    precompress_static()
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8000"))
+    print(f"Starting {workers} API workers, {os.environ['SLOW_LANE_WORKERS']} compute threads each")
+    uvicorn.run("main:app", host=host, port=port, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# tests/conftest.py
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# Окружение должно быть выставлено до импорта database/main:
+# отдельная временная БД и каталог состояния воркеров на прогон тестов
+_TMP_DIR = tempfile.mkdtemp(prefix="imagefilters-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'users.db')}")
+os.environ.setdefault("STATE_DIR", os.path.join(_TMP_DIR, "state"))
+os.environ.setdefault("WARMUP_FILTERS", "0")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Регистрирует нового пользователя и возвращает заголовок с access токеном"""
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    password = "password123"
+    assert client.post("/register", json={"email": email, "password": password}).status_code == 200
+    tokens = client.post("/login", json={"email": email, "password": password}).json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
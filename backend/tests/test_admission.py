@@ -0,0 +1,58 @@
+# tests/test_admission.py
+import asyncio
+import threading
+
+import pytest
+
+from utils.admission import AdmissionController, AdmissionRejected
+
+
+def test_idle_server_admits_job_larger_than_slo():
+    controller = AdmissionController(slo_ms=100, fast_workers=1, slow_workers=1)
+    # kmeans на 50 МП по априорной оценке намного дороже SLO, но очередь пуста
+    assert controller.estimate("kmeans", 50_000_000) > controller.slo_ms
+    result = asyncio.run(controller.run("kmeans", 50_000_000, lambda: "done"))
+    assert result == "done"
+    assert controller.stats()["rejected"] == 0
+
+
+def test_rejects_on_queue_delay_and_keeps_fast_lane_open():
+    controller = AdmissionController(slo_ms=100, fast_workers=1, slow_workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        heavy = asyncio.ensure_future(controller.run("kmeans", 50_000_000, release.wait))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.run("kmeans", 1_000_000, lambda: None)
+        # Дешёвый запрос идёт по быстрой полосе и не ждёт тяжёлый
+        cheap = await controller.run("canny", 10_000, lambda: "cheap")
+
+        release.set()
+        await heavy
+        return excinfo.value, cheap
+
+    rejected, cheap = asyncio.run(scenario())
+    assert cheap == "cheap"
+    assert rejected.retry_after_s >= 1
+    assert controller.stats()["rejected"] == 1
+    # После завершения тяжёлой работы очередь снова пуста
+    assert controller.stats()["lanes"]["slow"]["queue_delay_ms"] == 0
+
+
+def test_cost_model_learns_from_observed_timings():
+    controller = AdmissionController()
+    before = controller.estimate("stylize", 1_000_000)
+    for _ in range(20):
+        asyncio.run(controller.run("stylize", 1_000_000, lambda: None))
+    assert controller.estimate("stylize", 1_000_000) < before
+
+
+def test_unknown_filter_is_rejected_before_admission(client, auth_headers):
+    from utils.admission import admission
+
+    resp = client.post("/process/", headers=auth_headers, data={"filter_type": "no-such-filter"},
+                       files={"file": ("a.png", b"data", "image/png")})
+    assert resp.status_code == 400
+    assert "no-such-filter" not in admission.stats()["ms_per_mpx"]
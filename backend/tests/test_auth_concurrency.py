@@ -0,0 +1,43 @@
+# tests/test_auth_concurrency.py
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+PASSWORD = "password123"
+
+
+@pytest.mark.parametrize("prefix", ["", "/auth"])
+def test_parallel_register_and_login(client, prefix):
+    emails = [f"load-{uuid.uuid4().hex[:10]}@example.com" for _ in range(12)]
+
+    def register_and_login(email):
+        statuses = [client.post(f"{prefix}/register", json={"email": email, "password": PASSWORD}).status_code]
+        # Повторная регистрация того же email должна давать 400, а не 500
+        statuses.append(client.post(f"{prefix}/register", json={"email": email, "password": PASSWORD}).status_code)
+        login = client.post(f"{prefix}/login", json={"email": email, "password": PASSWORD})
+        statuses.append(login.status_code)
+        return statuses, login.text
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        results = list(pool.map(register_and_login, emails))
+
+    for statuses, login_body in results:
+        assert statuses == [200, 400, 200], login_body
+        assert "database is locked" not in login_body
+
+
+def test_parallel_registration_of_same_email(client):
+    email = f"race-{uuid.uuid4().hex[:10]}@example.com"
+
+    def register(_):
+        resp = client.post("/register", json={"email": email, "password": PASSWORD})
+        return resp.status_code, resp.text
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(register, range(8)))
+
+    codes = [code for code, _ in results]
+    assert codes.count(200) == 1
+    assert all(code in (200, 400) for code in codes), results
+    assert client.post("/login", json={"email": email, "password": PASSWORD}).status_code == 200
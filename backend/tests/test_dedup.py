@@ -0,0 +1,92 @@
+# tests/test_dedup.py
+import asyncio
+import json
+
+import cv2
+import numpy as np
+
+import image_routes
+from utils.dedup import dhash, hamming, group_duplicates
+from utils.video_io import FrameStore
+
+
+def _image(seed, h=64, w=64):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 256, (h, w, 3), dtype=np.uint8), (9, 9), 0)
+
+
+def test_near_duplicates_are_grouped():
+    base = _image(0)
+    brighter = cv2.add(base, 3)
+    other = _image(1)
+    representatives, assignment = group_duplicates([base, other, brighter, base.copy()])
+    assert representatives == [0, 1]
+    assert assignment == [0, 1, 0, 0]
+
+
+def test_same_content_different_size_is_not_grouped():
+    base = _image(0)
+    resized = cv2.resize(base, (32, 32))
+    # Хеши почти совпадают, но раздать результат кадру другого размера нельзя
+    assert hamming(dhash(base), dhash(resized)) <= 4
+    assert group_duplicates([base, resized])[0] == [0, 1]
+
+
+def test_flat_frames_of_different_colour_are_not_grouped():
+    black = np.zeros((64, 64, 3), np.uint8)
+    white = np.full((64, 64, 3), 255, np.uint8)
+    red = np.zeros((64, 64, 3), np.uint8)
+    red[..., 2] = 255
+    # У однотонных кадров dHash одинаковый, различает их только цвет миниатюр
+    assert dhash(black) == dhash(white) == dhash(red)
+    assert group_duplicates([black, white, red, black.copy(), white.copy()]) == (
+        [0, 1, 2], [0, 1, 2, 0, 1]
+    )
+
+
+def test_dedup_charges_admission_only_for_unique_pixels(monkeypatch):
+    calls = []
+
+    async def fake_run(filter_type, pixels, fn, *args):
+        calls.append((pixels, len(args[0])))
+        return fn(*args)
+
+    monkeypatch.setattr(image_routes.admission, "run", fake_run)
+    base = _image(0)
+    images = [base] * 10 + [_image(1)]
+
+    encoded, stats = asyncio.run(image_routes._process(images, "canny", lambda img: b"x", True, 4))
+
+    assert stats == {"total": 11, "unique": 2, "saved": 9}
+    assert calls == [(2 * 64 * 64, 2)]
+    assert len(encoded) == 11
+
+
+def test_dedup_keeps_spilled_frames_as_views(monkeypatch):
+    seen = []
+
+    async def fake_run(filter_type, pixels, fn, images, *args):
+        seen.extend(images)
+        return fn(images, *args)
+
+    monkeypatch.setattr(image_routes.admission, "run", fake_run)
+    with FrameStore(memory_budget=0) as store:
+        for seed in (0, 0, 1, 1, 2):
+            store.append(_image(seed))
+        asyncio.run(image_routes._process(store, "none", lambda img: b"x", True, 4))
+        assert len(seen) == 3
+        assert all(np.shares_memory(frame, store._mmap) for frame in seen)
+
+
+def test_inline_batch_reports_dedup_savings(client, auth_headers):
+    png = cv2.imencode(".png", _image(0))[1].tobytes()
+    other = cv2.imencode(".png", _image(5))[1].tobytes()
+    files = [("files", (f"f{i}.png", data, "image/png")) for i, data in enumerate([png, png, other, png])]
+
+    resp = client.post("/process/batch/inline/", headers=auth_headers, files=files,
+                       data={"filter_type": "kmeans", "dedup": "true"})
+
+    assert resp.status_code == 200
+    payload = json.loads(resp.content)
+    assert payload["dedup"] == {"total": 4, "unique": 2, "saved": 2}
+    assert payload["images"][0] == payload["images"][1] == payload["images"][3]
@@ -0,0 +1,55 @@
+# tests/test_filters.py
+import numpy as np
+import pytest
+
+from filters.base import FILTER_NAMES, apply_filter, apply_filter_batch, warm_up_filters
+
+
+def _image(h=32, w=48, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def test_batch_matches_per_frame_for_unbatched_filter():
+    frames = [_image(seed=i) for i in range(3)]
+    results = apply_filter_batch(frames, "canny")
+    for frame, result in zip(frames, results):
+        assert np.array_equal(result, apply_filter(frame, "canny"))
+
+
+def test_kmeans_batch_keeps_order_and_shapes():
+    frames = [_image(), _image(seed=1), _image(16, 16), _image(seed=2)]
+    results = apply_filter_batch(frames, "kmeans")
+    assert [r.shape for r in results] == [f.shape for f in frames]
+    # Кадры одной группы делят центроиды: не больше k цветов на всю группу
+    same_size = np.concatenate([results[i].reshape(-1, 3) for i in (0, 1, 3)])
+    assert len(np.unique(same_size, axis=0)) <= 4
+
+
+def test_kmeans_batch_accepts_4d_array():
+    stack = np.stack([_image(seed=i) for i in range(3)])
+    results = apply_filter_batch(stack, "kmeans")
+    assert len(results) == 3 and results[0].shape == stack[0].shape
+
+
+@pytest.mark.parametrize("filter_type", ["canny", "kmeans"])
+def test_bad_frame_does_not_fail_the_batch(filter_type):
+    frames = [_image(), None, _image(seed=1)]
+    results = apply_filter_batch(frames, filter_type)
+    assert results[1] is None
+    assert results[0] is not None and results[2] is not None
+
+
+def test_unknown_filter_raises():
+    with pytest.raises(ValueError):
+        apply_filter_batch([_image()], "no-such-filter")
+
+
+def test_every_registered_filter_runs():
+    img = _image()
+    for name in FILTER_NAMES:
+        assert apply_filter(img, name).shape == img.shape
+
+
+def test_warm_up_covers_all_filters():
+    assert set(warm_up_filters()) == set(FILTER_NAMES)
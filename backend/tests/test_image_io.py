@@ -0,0 +1,76 @@
+# tests/test_image_io.py
+import base64
+import json
+import tempfile
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.image_io import upload_to_array, array_to_base64_bytes, json_body_parts
+
+
+def _noise(h=256, w=256, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def _spooled(data: bytes, max_size: int):
+    """Файл загрузки как у Starlette: в памяти до max_size, дальше на диске"""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    spool.write(data)
+    spool.seek(0)
+    return spool
+
+
+def _peak_allocated(fn):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("max_size", [10 ** 8, 16], ids=["in-memory", "on-disk"])
+def test_upload_to_array_decodes_without_copying_input(max_size):
+    img = _noise()
+    data = cv2.imencode(".png", img)[1].tobytes()
+    spool = _spooled(data, max_size)
+
+    decoded, peak = _peak_allocated(lambda: upload_to_array(spool))
+
+    assert np.array_equal(decoded, img)
+    # Выделяется только сам декодированный массив, копии входных байт нет
+    assert peak < img.nbytes + len(data) // 10
+
+
+@pytest.mark.parametrize("max_size", [10 ** 8, 16], ids=["in-memory", "on-disk"])
+def test_upload_to_array_empty_file(max_size):
+    spool = _spooled(b"", max_size)
+    if max_size < 10 ** 8:
+        spool.rollover()
+    assert upload_to_array(spool) is None
+    # Буфер загрузки освобождён - файл закрывается без BufferError
+    spool.close()
+
+
+def test_json_body_parts_reference_encoded_images():
+    encoded = [array_to_base64_bytes(_noise(seed=i)) for i in range(3)] + [None]
+
+    parts, peak = _peak_allocated(lambda: json_body_parts("images", encoded, dedup={"saved": 0}))
+
+    # base64 изображений не копируется: в частях лежат те же объекты
+    assert [p for p in parts if any(p is e for e in encoded)] == encoded[:3]
+    assert peak < sum(len(e) for e in encoded[:3]) // 100
+    payload = json.loads(b"".join(parts))
+    assert payload["dedup"] == {"saved": 0}
+    assert payload["images"][3] is None
+    assert base64.b64decode(payload["images"][0]) == base64.b64decode(encoded[0])
+
+
+def test_json_body_parts_single_image():
+    encoded = array_to_base64_bytes(_noise())
+    parts = json_body_parts("image", encoded, duration_ms=5)
+    assert json.loads(b"".join(parts)) == {"image": encoded.decode(), "duration_ms": 5}
@@ -0,0 +1,66 @@
+# tests/test_image_routes.py
+import io
+import zipfile
+
+import cv2
+import numpy as np
+
+import image_routes
+
+
+def _png(seed=0, h=24, w=24):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    return cv2.imencode(".png", img)[1].tobytes()
+
+
+def _files(*payloads):
+    return [("files", (f"f{i}.png", data, "image/png")) for i, data in enumerate(payloads)]
+
+
+def test_process_single_image(client, auth_headers):
+    resp = client.post("/process/", headers=auth_headers, data={"filter_type": "canny"},
+                       files={"file": ("a.png", _png(), "image/png")})
+    assert resp.status_code == 200
+    assert resp.json()["image"]
+
+
+def test_single_image_encodes_inside_admitted_work(client, auth_headers, monkeypatch):
+    admitted = []
+    run = image_routes.admission.run
+
+    async def spy_run(filter_type, pixels, fn, *args):
+        result = await run(filter_type, pixels, fn, *args)
+        admitted.append(result)
+        return result
+
+    monkeypatch.setattr(image_routes.admission, "run", spy_run)
+    resp = client.post("/process/", headers=auth_headers, data={"filter_type": "canny"},
+                       files={"file": ("a.png", _png(), "image/png")})
+    # В полосе выполняется и кодирование: её результат - уже base64 ответа
+    assert resp.status_code == 200
+    assert admitted == [resp.json()["image"].encode()]
+
+
+def test_inline_batch_isolates_undecodable_file(client, auth_headers):
+    resp = client.post("/process/batch/inline/", headers=auth_headers, data={"filter_type": "kmeans"},
+                       files=_files(_png(0), b"not an image", b"", _png(1)))
+    assert resp.status_code == 200
+    images = resp.json()["images"]
+    assert images[1] is None and images[2] is None
+    assert images[0] and images[3]
+
+
+def test_process_empty_file_returns_json_error(client, auth_headers):
+    resp = client.post("/process/", headers=auth_headers, data={"filter_type": "canny"},
+                       files={"file": ("a.png", b"", "image/png")})
+    assert resp.status_code == 500
+    assert "error" in resp.json()
+
+
+def test_zip_batch_isolates_undecodable_file(client, auth_headers):
+    resp = client.post("/process/batch/", headers=auth_headers, data={"filter_type": "canny"},
+                       files=_files(_png(0), b"not an image", _png(1)))
+    assert resp.status_code == 200
+    names = set(zipfile.ZipFile(io.BytesIO(resp.content)).namelist())
+    assert names == {"filtered_1.png", "error_2.txt", "filtered_3.png"}
@@ -0,0 +1,102 @@
+# tests/test_static_files.py
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.static_files import (
+    IMMUTABLE_CACHE_CONTROL, PrecompressedStaticFiles, SPAStaticFiles, precompress_directory
+)
+
+INDEX_HTML = b"<!doctype html><html><body><div id='app'></div></body></html>" * 40
+APP_JS = b"console.log('filters');\n" * 200
+
+
+@pytest.fixture
+def dist(tmp_path):
+    """Сборка фронтенда: index.html и хешированный бандл в assets"""
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(INDEX_HTML)
+    (tmp_path / "assets" / "app-1a2b3c.js").write_bytes(APP_JS)
+    (tmp_path / "assets" / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 2000)
+    # brotli может быть не установлен - кладём готовый .br, как после сборки
+    (tmp_path / "assets" / "app-1a2b3c.js.br").write_bytes(b"brotli-body")
+    return tmp_path
+
+
+@pytest.fixture
+def static_client(dist):
+    app = FastAPI()
+    app.mount("/assets", PrecompressedStaticFiles(directory=str(dist / "assets"), immutable=True,
+                                                  precompress=True), name="assets")
+    app.mount("/", SPAStaticFiles(directory=str(dist), html=True, precompress=True), name="spa")
+    return TestClient(app)
+
+
+def test_precompress_writes_complete_files(dist):
+    precompress_directory(str(dist))
+    names = set(os.listdir(dist / "assets"))
+    assert "app-1a2b3c.js.gz" in names
+    # Бинарные файлы не сжимаются, временных файлов не остаётся
+    assert "logo.png.gz" not in names
+    assert not [name for name in names if name.endswith(".tmp")]
+    assert gzip.decompress((dist / "assets" / "app-1a2b3c.js.gz").read_bytes()) == APP_JS
+
+
+@pytest.mark.parametrize("accept, encoding", [
+    ("gzip", "gzip"),
+    ("br, gzip", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+])
+def test_asset_encoding_follows_accept_encoding(static_client, accept, encoding):
+    resp = static_client.get("/assets/app-1a2b3c.js", headers={"Accept-Encoding": accept})
+    assert resp.status_code == 200
+    assert resp.headers.get("content-encoding") == encoding
+    assert resp.headers["vary"] == "Accept-Encoding"
+    if encoding == "br":
+        assert resp.content == b"brotli-body"
+    else:
+        # gzip клиент распаковывает сам
+        assert resp.content == APP_JS
+
+
+def test_assets_are_cached_as_immutable(static_client):
+    resp = static_client.get("/assets/logo.png")
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert static_client.get("/assets/missing.js").status_code == 404
+
+
+def test_spa_route_falls_back_to_index_with_etag(static_client):
+    resp = static_client.get("/gallery/42", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert resp.content == INDEX_HTML
+    assert resp.headers["cache-control"] == "no-cache"
+    etag = resp.headers["etag"]
+
+    cached = static_client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+
+def test_index_representations_have_distinct_etags(static_client):
+    plain = static_client.get("/", headers={"Accept-Encoding": "identity"})
+    gzipped = static_client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.content == INDEX_HTML
+    assert plain.headers["etag"] != gzipped.headers["etag"]
+
+    # ETag сжатого тела не подтверждает тело без сжатия
+    resp = static_client.get("/", headers={"Accept-Encoding": "identity",
+                                           "If-None-Match": gzipped.headers["etag"]})
+    assert resp.status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/", "/gallery/42", "/assets/app-1a2b3c.js"])
+def test_non_get_methods_are_rejected(static_client, path):
+    assert static_client.post(path).status_code == 405
+    assert static_client.head(path).status_code == 200
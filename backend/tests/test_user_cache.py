@@ -0,0 +1,114 @@
+# tests/test_user_cache.py
+import threading
+import time
+import uuid
+
+import pytest
+
+from auth import crud
+from auth.cache import TTLCache, CachedUser, _MISSING
+from database import SessionLocal, ReadSessionLocal, create_tables
+
+
+@pytest.fixture
+def user_cache(monkeypatch):
+    cache = TTLCache(maxsize=64, ttl=60, negative_maxsize=8, negative_ttl=60)
+    monkeypatch.setattr(crud, "user_cache", cache)
+    # bcrypt здесь не проверяется, а тормозит цикл записей
+    monkeypatch.setattr(crud, "hash_password", lambda password: f"h:{password}")
+    create_tables()
+    return cache
+
+
+def test_set_after_invalidation_is_dropped():
+    cache = TTLCache()
+    generation = cache.generation()
+    # Читатель получил "пользователя нет" до записи, писатель успел инвалидировать
+    cache.invalidate("a@example.com")
+    cache.set("a@example.com", None, generation=generation)
+    assert cache.get("a@example.com") is _MISSING
+
+
+def test_negative_entries_do_not_evict_positive_ones():
+    cache = TTLCache(maxsize=4, negative_maxsize=2)
+    for i in range(4):
+        cache.set(f"user{i}", CachedUser(i, f"user{i}", "hash"))
+    for i in range(100):
+        cache.set(f"probe{i}", None)
+
+    assert all(cache.get(f"user{i}") is not _MISSING for i in range(4))
+    assert cache.stats()["negative_size"] == 2
+
+
+def test_negative_hit_then_create_user(user_cache):
+    email = f"neg-{uuid.uuid4().hex[:10]}@example.com"
+    db = SessionLocal()
+    try:
+        assert crud.get_user_by_email(db, email) is None
+        assert crud.get_user_by_email(db, email) is None
+        assert user_cache.stats()["negative_hits"] == 1
+
+        crud.create_user(db, email, "password123")
+        assert crud.get_user_by_email(db, email).email == email
+    finally:
+        db.close()
+
+
+def test_no_stale_record_survives_concurrent_writes(user_cache):
+    emails = [f"cc-{uuid.uuid4().hex[:10]}@example.com" for _ in range(4)]
+    stop = threading.Event()
+    errors = []
+
+    # Расширяем окно между чтением из БД и записью в кэш, чтобы гонка воспроизводилась
+    original_set = user_cache.set
+
+    def slow_set(*args, **kwargs):
+        time.sleep(0.002)
+        original_set(*args, **kwargs)
+
+    user_cache.set = slow_set
+
+    def reader():
+        db = ReadSessionLocal()
+        try:
+            while not stop.is_set():
+                for email in emails:
+                    crud.get_user_by_email(db, email)
+                    db.rollback()  # каждый поиск - в новой транзакции чтения
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    def check(email, expected_hash):
+        # После завершения записи в кэше либо ничего, либо актуальная запись
+        cached = user_cache.get(email)
+        if cached is _MISSING:
+            return
+        assert cached is not None, f"negative entry survived create_user for {email}"
+        assert cached.hashed_password == expected_hash, f"stale password hash for {email}"
+
+    readers = [threading.Thread(target=reader) for _ in range(6)]
+    for thread in readers:
+        thread.start()
+
+    db = SessionLocal()
+    try:
+        for email in emails:
+            assert crud.create_user(db, email, "initial") is not None
+            check(email, "h:initial")
+        for round_no in range(25):
+            for email in emails:
+                password = f"pw{round_no}"
+                assert crud.update_password(db, email, password) is not None
+                check(email, f"h:{password}")
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+        db.close()
+
+    assert not errors
+    for email in emails:
+        check(email, "h:pw24")
+    assert user_cache.stats()["hits"] > 0
@@ -0,0 +1,86 @@
+# tests/test_video_io.py
+import os
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.image_io import array_to_base64_bytes
+from utils.video_io import FrameStore, extract_significant_frames
+
+
+def _frame(i, h=120, w=160):
+    yy, xx = np.mgrid[0:h, 0:w]
+    return np.dstack([(xx + i) % 256, (yy + 2 * i) % 256, np.full_like(xx, i % 256)]).astype(np.uint8)
+
+
+def test_store_keeps_frames_in_memory_within_budget():
+    with FrameStore(memory_budget=_frame(0).nbytes * 4) as store:
+        for i in range(4):
+            store.append(_frame(i))
+        assert not store.spilled
+        assert np.array_equal(store[3], _frame(3))
+
+
+def test_store_spills_grows_and_cleans_up():
+    store = FrameStore(memory_budget=_frame(0).nbytes * 2)
+    for i in range(40):
+        store.append(_frame(i))
+
+    assert store.spilled and len(store) == 40
+    # Файл растёт от текущего числа кадров, а не от длины видео
+    assert store._mmap.shape[0] < 80
+    assert all(np.array_equal(store[i], _frame(i)) for i in (0, 1, 2, 17, 39))
+    assert np.array_equal(store[-1], _frame(39))
+    # Индекс и срез - view в memmap, без копии
+    assert isinstance(store[5].base, np.memmap) or isinstance(store[5], np.memmap)
+    assert np.shares_memory(store[10:20], store._mmap)
+
+    tmp_dir = store._tmp_dir
+    store.close()
+    assert not os.path.exists(tmp_dir)
+
+
+def test_store_index_out_of_range():
+    with FrameStore() as store:
+        store.append(_frame(0))
+        with pytest.raises(IndexError):
+            store[1]
+
+
+@pytest.mark.parametrize("filter_type", ["kmeans", "canny"])
+def test_video_filtering_memory_is_bounded_by_chunk(filter_type):
+    from image_routes import _filter_and_encode
+
+    with FrameStore(memory_budget=0) as store:
+        for i in range(256):
+            store.append(_frame(i))
+        total = sum(frame.nbytes for frame in store)
+
+        tracemalloc.start()
+        try:
+            results = _filter_and_encode(store, filter_type, array_to_base64_bytes)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    assert len(results) == 256 and all(results)
+    # Пиковая память определяется пачкой, а не длиной видео
+    assert peak < total // 3
+
+
+def test_extract_significant_frames(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (160, 120))
+    if not writer.isOpened():
+        pytest.skip("VideoWriter недоступен в этой сборке OpenCV")
+    black = np.zeros((120, 160, 3), np.uint8)
+    white = np.full((120, 160, 3), 255, np.uint8)
+    for frame in [black] * 5 + [white] * 5 + [black] * 5:
+        writer.write(frame)
+    writer.release()
+
+    with extract_significant_frames(path, threshold=30.0, memory_budget=0) as frames:
+        assert len(frames) == 3
+        assert frames.spilled
@@ -0,0 +1,121 @@
+# tests/test_workers.py
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import run
+from auth import models  # noqa: F401 - регистрирует таблицы для create_tables
+from auth.token_store import MemoryTokenStore, SQLTokenStore, TokenStore
+from database import create_tables
+from utils.workers import FileWorkerRegistry, WorkerRegistry
+
+
+@pytest.fixture(params=["memory", "sql"])
+def token_store(request):
+    if request.param == "sql":
+        create_tables()
+        return SQLTokenStore()
+    return MemoryTokenStore()
+
+
+def test_interfaces_are_abstract():
+    with pytest.raises(TypeError):
+        TokenStore()
+    with pytest.raises(TypeError):
+        WorkerRegistry()
+
+
+def test_token_store_round_trip_and_revocation(token_store):
+    jti = uuid.uuid4().hex
+    token_store.add(jti, "a@example.com", datetime.utcnow() + timedelta(days=1))
+    assert token_store.contains(jti)
+
+    assert token_store.discard(jti) is True
+    assert not token_store.contains(jti)
+    assert token_store.discard(jti) is False
+
+
+def test_token_store_ignores_expired_tokens(token_store):
+    jti = uuid.uuid4().hex
+    token_store.add(jti, "a@example.com", datetime.utcnow() - timedelta(seconds=1))
+    assert not token_store.contains(jti)
+
+
+def test_sql_token_store_is_shared_between_workers():
+    create_tables()
+    jti = uuid.uuid4().hex
+    # Разные экземпляры - как хранилища разных процессов над одной БД
+    SQLTokenStore().add(jti, "a@example.com", datetime.utcnow() + timedelta(days=1))
+    other_worker = SQLTokenStore()
+    assert other_worker.contains(jti)
+    assert other_worker.discard(jti)
+    assert not SQLTokenStore().contains(jti)
+
+
+def test_file_registry_drops_stale_workers(tmp_path):
+    registry = FileWorkerRegistry(str(tmp_path), stale_after_s=0.2)
+    registry.heartbeat("host-a-1", {"queue_depth": 2})
+    registry.heartbeat("host-b-1", {"queue_depth": 0})
+    assert {w["worker_id"] for w in registry.list()} == {"host-a-1", "host-b-1"}
+
+    time.sleep(0.3)
+    registry.heartbeat("host-b-1", {"queue_depth": 1})
+    workers = registry.list()
+    assert [w["worker_id"] for w in workers] == ["host-b-1"]
+    assert workers[0]["queue_depth"] == 1
+
+    registry.remove("host-b-1")
+    registry.remove("missing")
+    assert registry.list() == []
+
+
+@pytest.fixture
+def worker_env(monkeypatch):
+    """
+    Отдельное окружение для configure_workers: он пишет через os.environ.setdefault,
+    и monkeypatch.delenv не откатил бы ключи, которых не было до теста.
+    """
+    env = {}
+    monkeypatch.setattr(run.os, "environ", env)
+    return env
+
+
+def test_configure_workers_sizes_to_cores(worker_env):
+    worker_env["WEB_CONCURRENCY"] = "4"
+
+    assert run.configure_workers(cores=8) == 4
+    assert worker_env["SLOW_LANE_WORKERS"] == "2"
+    assert worker_env["TOKEN_STORE"] == "sql"
+    assert worker_env["USER_CACHE_NEGATIVE_TTL"] == "0"
+
+
+def test_configure_workers_handles_zero_concurrency(worker_env):
+    worker_env["WEB_CONCURRENCY"] = "0"
+
+    assert run.configure_workers(cores=4) == 1
+    assert worker_env["SLOW_LANE_WORKERS"] == "4"
+    # Один воркер - общее хранилище токенов не навязывается
+    assert "TOKEN_STORE" not in worker_env
+
+
+def test_health_and_ready(client):
+    health = client.get("/health").json()
+    assert health["worker_id"].startswith(f"{socket.gethostname()}-")
+    assert health["worker_id"] in {w["worker_id"] for w in health["workers"]}
+    assert "queue_depth" in health["workers"][0]
+
+    assert client.get("/ready").status_code == 200
+
+
+def test_refresh_token_is_single_use(client):
+    email = f"refresh-{uuid.uuid4().hex[:10]}@example.com"
+    client.post("/register", json={"email": email, "password": "password123"})
+    tokens = client.post("/login", json={"email": email, "password": "password123"}).json()
+
+    refreshed = client.post("/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refreshed.status_code == 200
+    # Старый refresh токен отозван в общем хранилище
+    assert client.post("/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
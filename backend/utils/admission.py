@@ -0,0 +1,164 @@
+# admission.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Целевая задержка: если прогноз ожидания в очереди больше - запрос отклоняется.
+# Собственная стоимость запроса не учитывается: дорогая работа на свободном сервере допускается
+ADMISSION_SLO_MS = float(os.getenv("ADMISSION_SLO_MS", "15000"))
+# Запросы с прогнозом не больше этого идут по быстрой полосе
+FAST_LANE_MS = float(os.getenv("FAST_LANE_MS", "250"))
+FAST_LANE_WORKERS = int(os.getenv("FAST_LANE_WORKERS", "2"))
+SLOW_LANE_WORKERS = int(os.getenv("SLOW_LANE_WORKERS", str(os.cpu_count() or 2)))
+
+# Начальные оценки стоимости фильтров (мс на мегапиксель) до первых замеров
+DEFAULT_MS_PER_MPX = {
+    "none": 1.0,
+    "canny": 10.0,
+    "kmeans": 2000.0,
+    "stylize": 1000.0,
+}
+UNKNOWN_MS_PER_MPX = 300.0
+
+
+class AdmissionRejected(Exception):
+    """Запрос отклонён: прогноз задержки превышает SLO."""
+
+    def __init__(self, estimated_ms: float, queue_delay_ms: float, slo_ms: float):
+        self.estimated_ms = estimated_ms
+        self.queue_delay_ms = queue_delay_ms
+        self.slo_ms = slo_ms
+        super().__init__(
+            f"Сервер перегружен: ожидание в очереди {queue_delay_ms:.0f} мс превышает лимит {slo_ms:.0f} мс"
+        )
+
+    @property
+    def retry_after_s(self) -> int:
+        return max(1, round(self.queue_delay_ms / 1000))
+
+
+class CostModel:
+    """Стоимость фильтра: экспоненциальное скользящее среднее мс на мегапиксель."""
+
+    def __init__(self, ms_per_mpx: float, alpha: float = 0.2, base_ms: float = 1.0):
+        self.ms_per_mpx = ms_per_mpx
+        self.alpha = alpha
+        self.base_ms = base_ms
+        self.samples = 0
+
+    def estimate(self, pixels: int) -> float:
+        return self.base_ms + self.ms_per_mpx * pixels / 1e6
+
+    def observe(self, pixels: int, duration_ms: float):
+        if pixels <= 0:
+            return
+        observed = max(duration_ms - self.base_ms, 0.0) / (pixels / 1e6)
+        self.ms_per_mpx += self.alpha * (observed - self.ms_per_mpx)
+        self.samples += 1
+
+
+class Lane:
+    """Полоса исполнения: свой пул потоков и учёт ожидаемой работы в очереди."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-lane")
+        self.pending_ms = 0.0
+        self.in_flight = 0
+
+    def queue_delay_ms(self) -> float:
+        return self.pending_ms / self.workers
+
+
+class AdmissionController:
+    """
+    Допуск запросов по прогнозу задержки в очереди.
+    Стоимость оценивается по типу фильтра и числу пикселей, модели
+    уточняются по фактическому времени обработки. Запрос отклоняется,
+    только если в его полосе уже есть работа и прогноз ожидания больше SLO.
+    Дешёвые запросы исполняются в отдельной быстрой полосе и не ждут тяжёлых.
+    filter_type должен быть проверен вызывающим кодом (см. FILTER_NAMES).
+    """
+
+    def __init__(self, slo_ms: float = ADMISSION_SLO_MS, fast_lane_ms: float = FAST_LANE_MS,
+                 fast_workers: int = FAST_LANE_WORKERS, slow_workers: int = SLOW_LANE_WORKERS):
+        self.slo_ms = slo_ms
+        self.fast_lane_ms = fast_lane_ms
+        self.fast = Lane("fast", fast_workers)
+        self.slow = Lane("slow", slow_workers)
+        self._models = {}
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+
+    def _model(self, filter_type: str) -> CostModel:
+        model = self._models.get(filter_type)
+        if model is None:
+            model = CostModel(DEFAULT_MS_PER_MPX.get(filter_type, UNKNOWN_MS_PER_MPX))
+            self._models[filter_type] = model
+        return model
+
+    def estimate(self, filter_type: str, pixels: int) -> float:
+        with self._lock:
+            return self._model(filter_type).estimate(pixels)
+
+    def _admit(self, filter_type: str, pixels: int):
+        with self._lock:
+            estimated = self._model(filter_type).estimate(pixels)
+            lane = self.fast if estimated <= self.fast_lane_ms else self.slow
+            delay = lane.queue_delay_ms()
+            # Свободная полоса принимает любую работу, иначе запрос никогда не выполнится
+            if lane.pending_ms > 0 and delay > self.slo_ms:
+                self.rejected += 1
+                raise AdmissionRejected(estimated, delay, self.slo_ms)
+            lane.pending_ms += estimated
+            lane.in_flight += 1
+            self.admitted += 1
+            return lane, estimated
+
+    async def run(self, filter_type: str, pixels: int, fn, *args):
+        """
+        Выполняет fn(*args) в подходящей полосе, если запрос проходит по SLO.
+        Иначе бросает AdmissionRejected.
+        """
+        lane, estimated = self._admit(filter_type, pixels)
+
+        def timed():
+            start = time.perf_counter()
+            result = fn(*args)
+            return result, (time.perf_counter() - start) * 1000
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, duration_ms = await loop.run_in_executor(lane.executor, timed)
+            with self._lock:
+                self._model(filter_type).observe(pixels, duration_ms)
+            return result
+        finally:
+            with self._lock:
+                lane.pending_ms -= estimated
+                lane.in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slo_ms": self.slo_ms,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "lanes": {
+                    lane.name: {
+                        "workers": lane.workers,
+                        "in_flight": lane.in_flight,
+                        "queue_delay_ms": round(lane.queue_delay_ms(), 1),
+                    }
+                    for lane in (self.fast, self.slow)
+                },
+                "ms_per_mpx": {name: round(m.ms_per_mpx, 2) for name, m in self._models.items()},
+            }
+
+
+# Общий контроллер процесса
+admission = AdmissionController()
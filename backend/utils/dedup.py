@@ -0,0 +1,61 @@
+# dedup.py
+import os
+
+import cv2
+import numpy as np
+
+# Максимальное расстояние Хэмминга между dHash, при котором кадры считаются дубликатами
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "4"))
+# Максимальная средняя разница миниатюр (0-255 на канал): dHash видит только перепады
+# яркости, и у однотонных кадров (чёрный, белый, титры) он одинаковый - нулевой
+DEDUP_MAX_MEAN_DIFF = float(os.getenv("DEDUP_MAX_MEAN_DIFF", "8"))
+
+
+def thumbnail(img: np.ndarray, hash_size: int = 8) -> np.ndarray:
+    """Цветная миниатюра (hash_size + 1) x hash_size, из которой считается dHash."""
+    small = cv2.resize(img, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return small.astype(np.int16)
+
+
+def _dhash_thumbnail(small: np.ndarray) -> int:
+    gray = small if small.ndim == 2 else cv2.cvtColor(small.astype(np.uint8), cv2.COLOR_BGR2GRAY)
+    bits = (gray[:, 1:] > gray[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash(img: np.ndarray, hash_size: int = 8) -> int:
+    """Разностный перцептивный хеш (dHash), 64 бита при hash_size=8."""
+    return _dhash_thumbnail(thumbnail(img, hash_size))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def group_duplicates(images, max_distance: int = DEDUP_MAX_DISTANCE,
+                     max_mean_diff: float = DEDUP_MAX_MEAN_DIFF):
+    """
+    Жадная группировка изображений по dHash.
+    Изображение попадает в первую группу того же размера, чей представитель
+    отличается не более чем на max_distance бит и чья миниатюра отличается
+    в среднем не более чем на max_mean_diff (разный цвет при одинаковом рисунке).
+    Возвращает (индексы представителей, номер группы для каждого изображения).
+    """
+    representatives = []
+    rep_keys = []
+    assignment = []
+    for i, img in enumerate(images):
+        small = thumbnail(img)
+        h = _dhash_thumbnail(small)
+        group = None
+        for g, (shape, rep_hash, rep_small) in enumerate(rep_keys):
+            if (shape == img.shape and hamming(h, rep_hash) <= max_distance
+                    and np.abs(small - rep_small).mean() <= max_mean_diff):
+                group = g
+                break
+        if group is None:
+            group = len(representatives)
+            representatives.append(i)
+            rep_keys.append((img.shape, h, small))
+        assignment.append(group)
+    return representatives, assignment
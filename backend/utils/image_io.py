@@ -2,15 +2,94 @@
 import cv2
 import numpy as np
 import base64
+import io
+import json
+import mmap
+import os
 
 
-def image_bytes_to_array(image_bytes: bytes) -> np.ndarray:
-    """Конвертирует байты в OpenCV-изображение."""
+def image_bytes_to_array(image_bytes) -> np.ndarray:
+    """Конвертирует байты (bytes, bytearray, memoryview, mmap) в OpenCV-изображение."""
     arr = np.frombuffer(image_bytes, np.uint8)
+    # На пустом буфере cv2.imdecode бросает исключение - возвращаем None, как для битых данных
+    if arr.size == 0:
+        return None
     return cv2.imdecode(arr, cv2.IMREAD_COLOR)
 
 
+def upload_to_array(fileobj) -> np.ndarray:
+    """
+    Декодирует изображение прямо из файла загрузки (UploadFile.file),
+    не создавая промежуточный объект bytes.
+    Небольшие загрузки лежат в памяти (BytesIO) - читаем через getbuffer(),
+    крупные SpooledTemporaryFile сбрасывает на диск - отображаем через mmap.
+    """
+    raw = getattr(fileobj, "_file", fileobj)
+
+    if isinstance(raw, io.BytesIO):
+        view = raw.getbuffer()
+        arr = np.frombuffer(view, np.uint8)
+        try:
+            return cv2.imdecode(arr, cv2.IMREAD_COLOR) if arr.size else None
+        finally:
+            # ndarray держит экспорт буфера BytesIO - иначе Starlette не сможет закрыть загрузку
+            del arr
+            view.release()
+
+    try:
+        fileno = raw.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        fileobj.seek(0)
+        return image_bytes_to_array(fileobj.read())
+
+    raw.flush()
+    if os.fstat(fileno).st_size == 0:
+        # Пустой файл нельзя отобразить через mmap
+        return None
+    with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+        arr = np.frombuffer(mapped, np.uint8)
+        img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+        # ndarray держит ссылку на буфер mmap - освобождаем до закрытия
+        del arr
+    return img
+
+
+def array_to_base64_bytes(img_array: np.ndarray) -> bytes:
+    """Кодирует OpenCV-изображение в PNG и base64 (bytes, без промежуточной str)."""
+    _, buf = cv2.imencode('.png', img_array)
+    return base64.b64encode(memoryview(buf))
+
+
 def array_to_base64(img_array: np.ndarray) -> str:
     """Конвертирует OpenCV-изображение в base64-строку."""
-    _, buf = cv2.imencode('.png', img_array)
-    return base64.b64encode(buf).decode()
+    return array_to_base64_bytes(img_array).decode()
+
+
+def json_body_parts(images_key: str, images, **extra) -> list:
+    """
+    Части JSON-тела ответа для потоковой отправки: base64-байты изображений
+    входят в список как есть, без перевода в str, json.dumps и склейки в одно тело.
+    images - bytes (одно изображение) или список bytes/None.
+    Алфавит base64 не требует экранирования в JSON.
+    """
+    head = b'{"' + images_key.encode() + b'":'
+    parts = []
+    if isinstance(images, (bytes, bytearray)):
+        parts += [head + b'"', images]
+        pending = b'"'
+    else:
+        # Разделители копятся в pending и уходят одной частью перед следующим изображением
+        pending = head + b"["
+        for i, encoded in enumerate(images):
+            if i:
+                pending += b","
+            if encoded is None:
+                pending += b"null"
+            else:
+                parts += [pending + b'"', encoded]
+                pending = b'"'
+        pending += b"]"
+    for key, value in extra.items():
+        pending += b"," + json.dumps(key).encode() + b":" + json.dumps(value).encode()
+    parts.append(pending + b"}")
+    return parts
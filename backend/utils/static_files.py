@@ -0,0 +1,205 @@
+# static_files.py
+import gzip
+import hashlib
+import mimetypes
+import os
+import tempfile
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+# Каталог собранного фронтенда
+STATIC_DIR = os.getenv("STATIC_DIR", "/app/frontend/dist")
+
+# Какие файлы имеет смысл сжимать заранее
+COMPRESSIBLE_EXTENSIONS = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map", ".mjs"}
+MIN_COMPRESS_SIZE = 1024
+
+# Расширение предсжатого файла -> значение Content-Encoding (в порядке предпочтения)
+ENCODINGS = [(".br", "br"), (".gz", "gzip")]
+
+# Предсжатие при создании приложения. Лаунчер (run.py) сжимает статику один раз
+# до запуска воркеров и выключает его, чтобы процессы не делали одну работу
+STATIC_PRECOMPRESS = os.getenv("STATIC_PRECOMPRESS", "1") == "1"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Разбор заголовка Accept-Encoding (кодировки с q=0 отбрасываются)."""
+    result = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        result.add(token)
+    return result
+
+
+def _write_atomic(path: str, data: bytes):
+    """Запись во временный файл в том же каталоге и переименование:
+    параллельный процесс видит либо целый файл, либо никакого."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def precompress_directory(directory: str):
+    """
+    Создаёт .gz (и .br, если установлен brotli) рядом с текстовыми файлами сборки,
+    если их ещё нет. Ошибки записи (read-only FS) игнорируются.
+    """
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            try:
+                if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                    continue
+                data = None
+                if not os.path.exists(path + ".gz"):
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    _write_atomic(path + ".gz", gzip.compress(data, compresslevel=9))
+                if brotli is not None and not os.path.exists(path + ".br"):
+                    if data is None:
+                        with open(path, "rb") as f:
+                            data = f.read()
+                    _write_atomic(path + ".br", brotli.compress(data))
+            except OSError as e:
+                print(f"Precompression skipped for {path}: {e}")
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Раздача статики с индексом файлов в памяти и поддержкой предсжатых
+    вариантов (.br/.gz) по Accept-Encoding.
+    immutable=True - для файлов с хешем в имени (/assets): кэш на год.
+    """
+
+    def __init__(self, *args, immutable: bool = False, precompress: bool = STATIC_PRECOMPRESS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable
+        if precompress:
+            precompress_directory(self.directory)
+        self._index = self._build_index()
+
+    def _build_index(self) -> dict:
+        """Путь -> (полный путь, stat, {кодировка: (путь, stat)})."""
+        index = {}
+        compressed_suffixes = tuple(ext for ext, _ in ENCODINGS)
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(compressed_suffixes) or name.endswith(".tmp"):
+                    continue
+                full_path = os.path.join(root, name)
+                rel_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                variants = {}
+                for ext, encoding in ENCODINGS:
+                    if os.path.exists(full_path + ext):
+                        variants[encoding] = (full_path + ext, os.stat(full_path + ext))
+                index[rel_path] = (full_path, os.stat(full_path), variants)
+        return index
+
+    def _lookup(self, path: str):
+        path = path.replace(os.sep, "/").lstrip("/")
+        return self._index.get(path)
+
+    def _serve_file(self, path: str, entry, scope) -> Response:
+        full_path, stat_result, variants = entry
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(path)[0] or "text/plain"
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL if self.immutable else REVALIDATE_CACHE_CONTROL}
+
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for _, encoding in ENCODINGS:
+                if encoding in variants and encoding in accepted:
+                    full_path, stat_result = variants[encoding]
+                    headers["Content-Encoding"] = encoding
+                    break
+
+        response = FileResponse(full_path, headers=headers, media_type=media_type, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        entry = self._lookup(path)
+        if entry is None:
+            raise HTTPException(status_code=404)
+        return self._serve_file(path, entry, scope)
+
+
+class SPAStaticFiles(PrecompressedStaticFiles):
+    """
+    Статика SPA: index.html хранится в памяти и отдаётся с ETag/304
+    для корня и любых неизвестных путей (клиентская маршрутизация),
+    без исключения 404 и обращения к файловой системе.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        with open(os.path.join(self.directory, "index.html"), "rb") as f:
+            self._index_html = f.read()
+        self._index_gzip = gzip.compress(self._index_html, compresslevel=9)
+        # У каждого представления свой ETag: тела gzip и без сжатия различаются
+        digest = hashlib.md5(self._index_html).hexdigest()
+        self._index_etags = {None: f'"{digest}"', "gzip": f'"{digest}-gz"'}
+
+    def _serve_index(self, scope) -> Response:
+        request_headers = Headers(scope=scope)
+        encoding = None
+        if "gzip" in accepted_encodings(request_headers.get("accept-encoding", "")):
+            encoding = "gzip"
+        etag = self._index_etags[encoding]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": REVALIDATE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request_headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        body = self._index_html
+        if encoding == "gzip":
+            body = self._index_gzip
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, headers=headers, media_type="text/html")
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        path = path.replace(os.sep, "/").lstrip("/")
+        if path in ("", ".", "index.html"):
+            return self._serve_index(scope)
+        entry = self._lookup(path)
+        if entry is None:
+            return self._serve_index(scope)
+        return self._serve_file(path, entry, scope)
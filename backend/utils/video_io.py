@@ -1,15 +1,122 @@
 # video_io.py
+import os
+import shutil
+import tempfile
+import weakref
+
 import cv2
 import numpy as np
 
-def extract_significant_frames(video_path: str, threshold: float = 30.0) -> list[np.ndarray]:
+# Сколько байт кадров держим в RAM, прежде чем сбросить их в memmap на диск
+FRAME_MEMORY_BUDGET = int(os.getenv("FRAME_MEMORY_BUDGET_MB", "256")) * 1024 * 1024
+
+
+class FrameStore:
+    """
+    Хранилище кадров одинакового размера.
+    Пока кадры укладываются в memory_budget, они лежат списком в памяти;
+    при превышении бюджета все кадры переносятся в np.memmap во временной
+    папке, который растёт удвоением. Доступ по индексу - O(1), для кадров
+    на диске индекс и срез возвращают view в отображение, без копирования.
+    Временные файлы удаляются в close() или при сборке мусора.
+    """
+
+    def __init__(self, memory_budget: int = FRAME_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._frames = []
+        self._nbytes = 0
+        self._mmap = None
+        self._path = None
+        self._count = 0
+        self._tmp_dir = None
+        self._finalizer = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._mmap is not None
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if self._mmap is not None:
+                # Срез memmap - view (N, H, W, C) без копирования
+                return self._mmap[start:stop:step]
+            return self._frames[start:stop:step]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("frame index out of range")
+        if self._mmap is not None:
+            return self._mmap[index]
+        return self._frames[index]
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def append(self, frame: np.ndarray):
+        if self._mmap is None:
+            if self._nbytes + frame.nbytes <= self.memory_budget:
+                self._frames.append(frame)
+                self._nbytes += frame.nbytes
+                self._count += 1
+                return
+            self._spill(frame)
+
+        if self._count >= self._mmap.shape[0]:
+            self._grow(self._mmap.shape[0] * 2)
+        self._mmap[self._count] = frame
+        self._count += 1
+
+    def _spill(self, frame: np.ndarray):
+        """Выделяет memmap и переносит туда уже накопленные кадры."""
+        self._tmp_dir = tempfile.mkdtemp(prefix="frames_")
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self._tmp_dir, ignore_errors=True)
+        self._path = os.path.join(self._tmp_dir, "frames.dat")
+
+        # Начинаем с небольшого запаса, дальше файл растёт удвоением в _grow
+        capacity = max(16, 2 * self._count)
+        self._mmap = np.memmap(self._path, dtype=frame.dtype, mode="w+", shape=(capacity,) + frame.shape)
+        for i, stored in enumerate(self._frames):
+            self._mmap[i] = stored
+        self._frames = []
+        self._nbytes = 0
+
+    def _grow(self, capacity: int):
+        """Увеличивает файл и переотображает его с новой ёмкостью."""
+        frame_shape = self._mmap.shape[1:]
+        dtype = self._mmap.dtype
+        self._mmap.flush()
+        with open(self._path, "r+b") as f:
+            f.truncate(capacity * int(np.prod(frame_shape)) * dtype.itemsize)
+        self._mmap = np.memmap(self._path, dtype=dtype, mode="r+", shape=(capacity,) + frame_shape)
+
+    def close(self):
+        self._frames = []
+        self._mmap = None
+        self._count = 0
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def extract_significant_frames(video_path: str, threshold: float = 30.0,
+                               memory_budget: int = FRAME_MEMORY_BUDGET) -> FrameStore:
     cap = cv2.VideoCapture(video_path)
-    frames = []
+    frames = FrameStore(memory_budget=memory_budget)
 
     success, prev = cap.read()
     if not success:
         cap.release()
-        return []
+        return frames
 
     prev_gray = cv2.cvtColor(prev, cv2.COLOR_BGR2GRAY)
     frames.append(prev)
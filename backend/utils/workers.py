@@ -0,0 +1,94 @@
+# workers.py
+import json
+import os
+import socket
+import tempfile
+import time
+from abc import ABC, abstractmethod
+
+# Каталог общего состояния воркеров (должен быть общим для всех процессов на машине)
+STATE_DIR = os.getenv("STATE_DIR", os.path.join(tempfile.gettempdir(), "imagefilters-state"))
+HEARTBEAT_INTERVAL_S = float(os.getenv("HEARTBEAT_INTERVAL_S", "5"))
+
+
+class WorkerRegistry(ABC):
+    """Интерфейс реестра воркеров: каждый воркер публикует свою нагрузку."""
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, data: dict):
+        ...
+
+    @abstractmethod
+    def remove(self, worker_id: str):
+        ...
+
+    @abstractmethod
+    def list(self) -> list:
+        ...
+
+
+class FileWorkerRegistry(WorkerRegistry):
+    """
+    Реестр на локальных файлах: один JSON на воркер в STATE_DIR.
+    Записи старше трёх интервалов heartbeat считаются умершими.
+    """
+
+    def __init__(self, directory: str = STATE_DIR, stale_after_s: float = HEARTBEAT_INTERVAL_S * 3):
+        self.directory = directory
+        self.stale_after_s = stale_after_s
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, worker_id: str) -> str:
+        return os.path.join(self.directory, f"worker-{worker_id}.json")
+
+    def heartbeat(self, worker_id: str, data: dict):
+        record = dict(data, worker_id=worker_id, updated_at=time.time())
+        # Атомарная запись: во временный файл и переименование
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self._path(worker_id))
+
+    def remove(self, worker_id: str):
+        try:
+            os.remove(self._path(worker_id))
+        except FileNotFoundError:
+            pass
+
+    def list(self) -> list:
+        now = time.time()
+        workers = []
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith("worker-") and name.endswith(".json")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if now - record.get("updated_at", 0) > self.stale_after_s:
+                continue
+            workers.append(record)
+        return workers
+
+
+def create_worker_registry() -> WorkerRegistry:
+    return FileWorkerRegistry()
+
+
+def worker_load() -> dict:
+    """Нагрузка текущего процесса: очереди контроля допуска и load average машины."""
+    from utils.admission import admission
+
+    stats = admission.stats()
+    load = {
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "queue_depth": sum(lane["in_flight"] for lane in stats["lanes"].values()),
+        "lanes": stats["lanes"],
+        "rejected": stats["rejected"],
+    }
+    if hasattr(os, "getloadavg"):
+        load["loadavg"] = [round(x, 2) for x in os.getloadavg()]
+    return load